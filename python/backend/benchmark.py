@@ -1,12 +1,33 @@
 import gc
+import itertools
 import sys
 import time
 import traceback
 import tracemalloc
+from collections.abc import Collection
+from functools import lru_cache
+from types import CodeType
 from typing import Sequence, Callable
 
+import numpy as np
+import pydantic_core
 
-from shared_lib.model import CodeResponse, MemoryMeasurement, MemoryMeasurementResponse, TimeMeasurementResponse
+from shared_lib.model import CodeResponse, MemoryMeasurementResponse, TimeMeasurementResponse
+
+
+@lru_cache(maxsize=256)
+def compile_code(code: str) -> CodeType:
+    """Compile user code, repeated submissions of the same code are cached
+
+    Compiled with optimize=2, so docstrings and assert statements are stripped.
+
+    Args:
+        code (str): Python source code.
+
+    Returns:
+        CodeType: Code object ready to be executed.
+    """
+    return compile(code, "<user>", "exec", optimize=2)
 
 
 def prepare_function_arguments(input_data) -> tuple[list, dict]:
@@ -30,111 +51,171 @@ def prepare_function_arguments(input_data) -> tuple[list, dict]:
     return args, kwargs
 
 
-def remove_outliers(data: Sequence[float]) -> Sequence[float]:
+def estimate_result_size(result: object, sample_size: int = 64) -> int:
+    """Estimate size of the result including its items.
+
+    Only the first `sample_size` items of a container are measured and
+    their average size is extrapolated to the whole container.
+
+    Args:
+        result (object): Any result of the user function.
+        sample_size (int): Maximal number of items to measure.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    size = sys.getsizeof(result)
+    if isinstance(result, (str, bytes)) or not isinstance(result, Collection):
+        return size
+    sample = list(itertools.islice(result, sample_size))
+    if sample:
+        size += sum(map(sys.getsizeof, sample)) * len(result) // len(sample)
+    return size
+
+
+def remove_outliers(data: Sequence[float]) -> np.ndarray:
     """Remove outliers from data using the interquartile range (IQR) method.
 
     Args:
         data (Iterable[Numeric]): Any numeric data.
 
     Returns:
-        list[Numeric]: Any numeric data with outliers removed.
+        np.ndarray: Any numeric data with outliers removed, as float64.
     """
-    data_list = list(data)
-    if len(data_list) < 4:
-        return data_list
-    sorted_data = sorted(data_list)
-    n = len(sorted_data)
+    arr = np.asarray(data, dtype=np.float64)
+    n = arr.size
+    if n < 4:
+        return arr
     q1_idx = n // 4
     q3_idx = 3 * n // 4
-    q1 = sorted_data[q1_idx]
-    q3 = sorted_data[q3_idx]
+    # Partial sort is enough to place both quartiles at their sorted index
+    q1, q3 = np.partition(arr, [q1_idx, q3_idx])[[q1_idx, q3_idx]]
     iqr = q3 - q1
     lower_bound: float = q1 - 1.5 * iqr
     upper_bound: float = q3 + 1.5 * iqr
-    filtered = [x for x in data_list if lower_bound <= x <= upper_bound]
-    return filtered if len(filtered) >= len(data_list) * 0.5 else data_list
+    filtered = arr[(arr >= lower_bound) & (arr <= upper_bound)]
+    return filtered if filtered.size >= n * 0.5 else arr
 
 
-def time_benchmark(
-    func: Callable, args: list, kwargs: dict, num_runs: int = 100, warmup_runs: int = 10
-):
+def trace_memory(func: Callable, args: list, kwargs: dict) -> tuple[int, int, int]:
+    """Run the function once with memory allocations traced.
+
+    Args:
+        func (Callable): Function to measure.
+        args (list): Positional arguments of the function.
+        kwargs (dict): Keyword arguments of the function.
+
+    Returns:
+        tuple[int, int, int]: Current bytes, peak bytes and result size.
     """
-    Perform time benchmarking with:
-    - Warm-up runs to stabilize JIT/caching
-    - Multiple measurements
+    # One frame is enough as no tracebacks are taken
+    tracemalloc.start(1)
+    try:
+        result = func(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Try to measure the result object itself
+    return current, peak, estimate_result_size(result)
+
+
+def time_and_memory_benchmark(
+    func: Callable,
+    args: list,
+    kwargs: dict,
+    num_runs: int = 100,
+    warmup_runs: int = 10,
+    memory_samples: int = 10,
+    min_batch_ns: int = 100_000,
+) -> tuple[TimeMeasurementResponse, MemoryMeasurementResponse]:
+    """
+    Perform time and memory benchmarking in a single pass with:
+    - Warm-up runs to stabilize JIT/caching (at least two)
+    - Warm-up overhead measured separately from the steady state
+    - Fast functions timed in batches of at least `min_batch_ns`
+    - `memory_samples` of the `num_runs` runs traced for memory instead of
+      timed, tracing slows down every allocation of a timed run
     - Outlier removal using IQR method
     - Statistical analysis
+
+    `num_runs` is the total number of measured runs, only
+    `num_runs - memory_samples` of them are timed.
     """
+    if not 0 <= memory_samples < num_runs:
+        raise ValueError(
+            f"memory_samples ({memory_samples}) must be non-negative and lower than num_runs ({num_runs})"
+        )
+    warmup_runs = max(2, warmup_runs)
+    perf_counter_ns = time.perf_counter_ns
+
     # Warm-up phase - let JIT and caching stabilize
+    warmup_start = time.perf_counter()
     for _ in range(warmup_runs):
         _ = func(*args, **kwargs)
+    warmup_total = time.perf_counter() - warmup_start
+
+    # Calibration - a single call faster than a batch is repeated `loops`
+    # times per measurement so the timer overhead does not dominate it
+    start = perf_counter_ns()
+    _ = func(*args, **kwargs)
+    single_run_ns = perf_counter_ns() - start
+    loops = max(1, min_batch_ns // max(1, single_run_ns))
+
+    # Memory samples are spread evenly over the runs
+    memory_runs = np.zeros(num_runs, dtype=bool)
+    memory_runs[np.linspace(0, num_runs, memory_samples, endpoint=False, dtype=np.int64)] = True
 
     # Force garbage collection before measurement
     gc.collect()
 
-    # Measurement phase
-    times = []
-
-    for _ in range(num_runs):
-        start = time.perf_counter()
-        _ = func(*args, **kwargs)
-        end = time.perf_counter()
-        times.append(end - start)
+    # Measurement phase - collection pauses are kept out of the samples,
+    # integer timestamps go straight into a preallocated array
+    times = np.empty(num_runs - memory_samples, dtype=np.int64)
+    current_bytes = np.empty(memory_samples, dtype=np.int64)
+    peak_bytes = np.empty(memory_samples, dtype=np.int64)
+    result_sizes = np.empty(memory_samples, dtype=np.int64)
 
-    return TimeMeasurementResponse(
-        time_measurements=times,
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        t = m = 0
+        for is_memory_run in memory_runs.tolist():
+            if is_memory_run:
+                # Garbage of previous runs must not count to the sample
+                gc.collect(0)
+                current_bytes[m], peak_bytes[m], result_sizes[m] = trace_memory(func, args, kwargs)
+                m += 1
+            else:
+                start = perf_counter_ns()
+                for _ in range(loops):
+                    _ = func(*args, **kwargs)
+                times[t] = perf_counter_ns() - start
+                t += 1
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    timing_stats = TimeMeasurementResponse.model_construct(
+        time_measurements=times * (1e-9 / loops),
         outlier_filter=remove_outliers,
+        loops=loops,
     )
-
-
-def memory_benchmark(
-    func: Callable, args: list, kwargs: dict, num_samples: int = 10
-) -> MemoryMeasurementResponse:
-    """
-    Measure memory using multiple samples - tracking peak allocations
-    """
-    memory_measurements = []
-
-    for _ in range(num_samples):
-        # Force garbage collection and measure baseline
-        gc.collect()
-        gc.collect()
-
-        # start measuring allocation of memory objects
-        tracemalloc.start()
-
-        # Execute function
-        result = func(*args, **kwargs)
-
-        # Get peak memory usage during function execution
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-
-        # Try to measure the result object itself
-        result_size = sys.getsizeof(result)
-        # If result is a container, measure contents too
-        if hasattr(result, "__iter__") and not isinstance(result, (str, bytes)):
-            for item in list(result):
-                result_size += sys.getsizeof(item)
-
-        memory_measurements.append(
-            MemoryMeasurement(
-                current_bytes=current, peak_bytes=peak, result_size=result_size
-            )
-        )
-
-        # Clean up for next iteration
-        del result
-        gc.collect()
-
-    return MemoryMeasurementResponse(
-        memory_measurements=memory_measurements,
+    # Time spent in warm-up on top of the same number of steady-state runs;
+    # warm-up runs unbatched with GC enabled, so it can also come out faster
+    timing_stats.warmup_overhead = max(0.0, warmup_total - warmup_runs * timing_stats.median_time)
+
+    memory_stats = MemoryMeasurementResponse.model_construct(
+        current_bytes=current_bytes,
+        peak_bytes=peak_bytes,
+        result_sizes=result_sizes,
         outlier_filter=remove_outliers,
     )
+    return timing_stats, memory_stats
 
 
 def run_benchmarks(
-    code: str,
+    code: str | CodeType,
     input_data: object,
     num_runs: int = 100,
     warmup_runs: int = 10,
@@ -142,30 +223,45 @@ def run_benchmarks(
 ):
     """
     Run comprehensive test with robust benchmarking
+
+    The code is either source code or an already compiled code object.
     """
     # Create a clean namespace
     namespace = {}
 
-    # Execute the user code, most tricky part ...
-    exec(code, namespace)
-
-    func = namespace.get("solution")
-    if not func:
-        raise Exception(
-            "No callable function found. Please define a function 'solution'"
-        )
-
     args, kwargs = prepare_function_arguments(input_data)
 
     try:
+        # Execute the user code, most tricky part ...
+        code_object = code if isinstance(code, CodeType) else compile_code(code)
+        exec(code_object, namespace)
+
+        func = namespace.get("solution")
+        if not func:
+            raise Exception(
+                "No callable function found. Please define a function 'solution'"
+            )
+
         result = func(*args, **kwargs)
-        # Run timing benchmark
-        timing_stats = time_benchmark(func, args, kwargs, num_runs, warmup_runs)
+        # The response is pickled back from a worker process and sent as JSON,
+        # results of other types (arrays, classes of the user code) go as text
+        result = pydantic_core.to_jsonable_python(result, fallback=str)
 
-        # Run memory benchmark
-        memory_stats = memory_benchmark(func, args, kwargs, memory_samples)
+        # Freeze everything alive so far, collections during the benchmarks
+        # then only walk objects created by the measured function
+        gc.collect()
+        gc.freeze()
+        try:
+            # Run timing and memory benchmark
+            timing_stats, memory_stats = time_and_memory_benchmark(
+                func, args, kwargs, num_runs, warmup_runs, memory_samples
+            )
+        finally:
+            gc.unfreeze()
 
-        return CodeResponse(result=result, success=True, time=timing_stats, memory=memory_stats)
+        # All fields are produced here, validation is skipped; the only
+        # validator (result_str) applies to failed runs
+        return CodeResponse.model_construct(result=result, success=True, time=timing_stats, memory=memory_stats)
     except Exception as e:
         return CodeResponse(
             result=None,
@@ -180,9 +276,7 @@ if __name__ == "__main__":
     # Example usage
     test_code_1 = """
 def solution(x):
-    total = []
-    for i in range(x):
-        total.append(i)
+    total = list(range(x))
     return total
 """
 
@@ -1,11 +1,61 @@
 import ast
+import asyncio
+import copyreg
+import marshal
+import multiprocessing
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import CodeType
 
 import fastapi
 import uvicorn
 import pydantic
 from fastapi.middleware.cors import CORSMiddleware
 
-from shared_lib.model import CodeRequest
+from shared_lib.model import CodeRequest, CodeResponse, MemoryMeasurementResponse, TimeMeasurementResponse
+
+from benchmark import run_benchmarks
+
+# Code objects are not picklable, they are sent to the workers marshalled
+copyreg.pickle(CodeType, lambda code: (marshal.loads, (marshal.dumps(code),)))
+
+
+def create_executor() -> ProcessPoolExecutor:
+    """Create the pool of processes running the user code
+
+    User code runs in separate processes, it must not block the event loop
+    and its allocations and globals must not mix with the server ones.
+    The forkserver start method is not available on Windows.
+    """
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn" if sys.platform == "win32" else "forkserver"),
+    )
+
+
+executor = create_executor()
+
+# Upper bound of a single benchmark, a solution that never returns would
+# otherwise hold a worker forever
+BENCHMARK_TIMEOUT = 30.0
+
+
+def replace_executor(pool: ProcessPoolExecutor) -> None:
+    """Replace a broken or stuck pool, once even for concurrent requests
+
+    A running future cannot be cancelled, so the workers of the old pool
+    are terminated; other benchmarks still running in it fail as well.
+    """
+    global executor
+    if executor is not pool:
+        return
+    executor = create_executor()
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
 
 app = fastapi.FastAPI()
 app.add_middleware(
@@ -17,12 +67,41 @@ app.add_middleware(
 )
 
 @app.post("/")
-async def analyze_code(snippet: CodeRequest):
+async def analyze_code(snippet: CodeRequest) -> CodeResponse:
     print("Received code snippet for analysis.")
-    print(snippet.code)
-    # Placeholder for code analysis logic
-    analysis_result = {"length": len(snippet.code), "lines": snippet.code.count("\n") + 1}
-    return analysis_result
+    loop = asyncio.get_running_loop()
+    pool = executor
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(
+                pool, run_benchmarks, snippet.code_object, snippet.kwargs or snippet.args, 100, 10, 10
+            ),
+            BENCHMARK_TIMEOUT,
+        )
+    except TimeoutError:
+        replace_executor(pool)
+        error = f"Benchmark did not finish within {BENCHMARK_TIMEOUT} seconds"
+    except Exception as e:
+        # A worker killed by the user code breaks the whole pool, replace it
+        # so that following requests do not fail as well
+        if isinstance(e, BrokenProcessPool):
+            replace_executor(pool)
+        error = str(e) + "\n" + traceback.format_exc()
+    return CodeResponse(
+        result=None,
+        success=False,
+        time=TimeMeasurementResponse(),
+        memory=MemoryMeasurementResponse(),
+        error=error,
+    )
 
 if __name__ == "__main__":
-    uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Production entrypoint, use dev.py for auto-reload during development
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        reload=False,
+    )
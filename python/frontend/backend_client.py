@@ -0,0 +1,11 @@
+import httpx
+from nicegui import app
+
+# Lives in its own module as NiceGUI re-executes the main script for every
+# page visit, imported modules are shared by all of them.
+# Reads wait longer than the backend's own limit for a single benchmark.
+client = httpx.AsyncClient(
+    base_url="http://localhost:8000",
+    timeout=httpx.Timeout(5.0, read=60.0),
+)
+app.on_shutdown(client.aclose)
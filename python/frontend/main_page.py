@@ -1,18 +1,33 @@
-import requests
+import asyncio
+
+import httpx
 from nicegui.events import ValueChangeEventArguments
 from nicegui import ui
 
-def send_message(message: ValueChangeEventArguments):
+from backend_client import client
+
+in_flight: asyncio.Task | None = None
+
+async def send_message(message: ValueChangeEventArguments):
+    global in_flight
+    # Only the latest code matters, drop the request still waiting for the older one
+    if in_flight is not None and not in_flight.done():
+        in_flight.cancel()
+    in_flight = asyncio.current_task()
+
     ui.notify(f'You sent: {message.value}')
-    response = requests.post(
-        "http://localhost:8000/",
-        json={"code": message.value}
-    )
+    try:
+        response = await client.post(
+            "/",
+            json={"code": message.value}
+        )
+    except httpx.HTTPError as e:
+        ui.notify(f'Request to the backend failed: {type(e).__name__} {e}', type='negative')
 
 ui.label('Hello NiceGUI!')
 ui.textarea(label='Text', placeholder='start typing',
-            on_change=send_message)
+            on_change=send_message).props('debounce=300')
 result = ui.label()
 
-ui.run()
-ui.run()
\ No newline at end of file
+if __name__ in {"__main__", "__mp_main__"}:
+    ui.run()
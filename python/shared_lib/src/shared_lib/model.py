@@ -1,32 +1,59 @@
-import ast
-
 from functools import cached_property
+from types import CodeType
 from typing import Callable, Sequence
 
+import numpy as np
 import pydantic
 
+def _median(data: np.ndarray) -> float:
+    """Element at index n // 2 of the sorted data, selected without a full sort"""
+    if not data.size:
+        return 0.0
+    k = data.size // 2
+    return float(np.partition(data, k)[k])
+
 class CodeRequest(pydantic.BaseModel):
     code: str = pydantic.Field(..., description="The code snippet to be analyzed")
     args: list[str] = pydantic.Field(default_factory=list, description="Optional arguments for the code")
     kwargs: dict[str, str] = pydantic.Field(default_factory=dict, description="Optional keyword arguments for the code")
 
-    @pydantic.field_validator('code')
-    def validate_python_code(cls, v):
+    _code_object: CodeType = pydantic.PrivateAttr()
+
+    @pydantic.model_validator(mode='after')
+    def validate_python_code(self):
         try:
-            ast.parse(v)
+            self._code_object = compile(self.code, "<user>", "exec", optimize=2)
         except SyntaxError as e:
             raise ValueError(f"Invalid Python code: {e}")
-        return v
+        return self
+
+    @property
+    def code_object(self) -> CodeType:
+        """Code compiled during validation, ready to be executed"""
+        return self._code_object
     
-class MemoryMeasurement(pydantic.BaseModel):
-    current_bytes: int = pydantic.Field(..., description="Current memory usage in bytes")
-    peak_bytes: int = pydantic.Field(..., description="Peak memory usage in bytes")
-    result_size: int = pydantic.Field(..., description="Size of the result in bytes")
+class _ArrayModel(pydantic.BaseModel):
+    """Model with NumPy array fields, arrays are compared by their values"""
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True, ignored_types=(cached_property,))
 
-class MemoryMeasurementResponse(pydantic.BaseModel):
-    memory_measurements: list[MemoryMeasurement] = pydantic.Field(default_factory=list, description="List of memory measurements", exclude=True, repr=False)
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        for name in type(self).model_fields:
+            value, other_value = getattr(self, name), getattr(other, name)
+            if isinstance(value, np.ndarray) or isinstance(other_value, np.ndarray):
+                if not np.array_equal(value, other_value):
+                    return False
+            elif value != other_value:
+                return False
+        return True
+
+class MemoryMeasurementResponse(_ArrayModel):
+    current_bytes: np.ndarray = pydantic.Field(default_factory=lambda: np.empty(0, dtype=np.int64), description="Current memory usage in bytes per sample", exclude=True, repr=False)
+    peak_bytes: np.ndarray = pydantic.Field(default_factory=lambda: np.empty(0, dtype=np.int64), description="Peak memory usage in bytes per sample", exclude=True, repr=False)
+    result_sizes: np.ndarray = pydantic.Field(default_factory=lambda: np.empty(0, dtype=np.int64), description="Size of the result in bytes per sample", exclude=True, repr=False)
     outlier_filter: Callable[[Sequence[float]], Sequence[float]] = pydantic.Field(
-        default=lambda x: list(x),
+        default=list,
         exclude=True,
         repr=False,
         description="Function to filter outliers from data"
@@ -35,102 +62,123 @@ class MemoryMeasurementResponse(pydantic.BaseModel):
     @cached_property
     def filtered_current_bytes(self) -> Sequence[float]:
         """Current memory usage after removing outliers"""
-        return self.outlier_filter([m.current_bytes for m in self.memory_measurements])
+        return self.outlier_filter(self.current_bytes)
 
     @cached_property
     def filtered_peak_bytes(self) -> Sequence[float]:
         """Peak memory usage after removing outliers"""
-        return self.outlier_filter([m.peak_bytes for m in self.memory_measurements])
+        return self.outlier_filter(self.peak_bytes)
+
+    @cached_property
+    def _stats(self) -> dict[str, float]:
+        """Summary statistics of the memory measurements, computed once"""
+        current = np.asarray(self.filtered_current_bytes, dtype=np.float64)
+        peak = np.asarray(self.filtered_peak_bytes, dtype=np.float64)
+        return {
+            "mean_used": float(current.mean()) if current.size else 0.0,
+            "median_used": _median(current),
+            "mean_peak": float(peak.mean()) if peak.size else 0.0,
+            "median_peak": _median(peak),
+            "result_size": float(self.result_sizes.mean()) if self.result_sizes.size else 0.0,
+        }
 
     @pydantic.computed_field
     @property
     def mean_used_bytes(self) -> float:
         """Mean of current memory usage after removing outliers"""
-        return sum(self.filtered_current_bytes) / len(self.filtered_current_bytes) if self.filtered_current_bytes else 0.0
+        return self._stats["mean_used"]
     
     @pydantic.computed_field
     @property
     def median_used_bytes(self) -> float:
         """Median of current memory usage after removing outliers"""
-        if not self.filtered_current_bytes:
-            return 0.0
-        return sorted(self.filtered_current_bytes)[len(self.filtered_current_bytes) // 2]
+        return self._stats["median_used"]
     
     @pydantic.computed_field
     @property
     def mean_peak_bytes(self) -> float:
         """Mean of peak memory usage after removing outliers"""
-        return sum(self.filtered_peak_bytes) / len(self.filtered_peak_bytes) if self.filtered_peak_bytes else 0.0
+        return self._stats["mean_peak"]
     
     @pydantic.computed_field
     @property
     def median_peak_bytes(self) -> float:
         """Median of peak memory usage after removing outliers"""
-        if not self.filtered_peak_bytes:
-            return 0.0
-        return sorted(self.filtered_peak_bytes)[len(self.filtered_peak_bytes) // 2]
+        return self._stats["median_peak"]
     
     @pydantic.computed_field
     @property
     def result_size_bytes(self) -> float:
         """Average size of the result"""
-        sizes = [m.result_size for m in self.memory_measurements]
-        return sum(sizes) / len(sizes) if sizes else 0.0
+        return self._stats["result_size"]
     
-class TimeMeasurementResponse(pydantic.BaseModel):
-    time_measurements: list[float] = pydantic.Field(default_factory=list, description="List of time measurements", exclude=True, repr=False)
+class TimeMeasurementResponse(_ArrayModel):
+    time_measurements: np.ndarray = pydantic.Field(default_factory=lambda: np.empty(0), description="Array of time measurements in seconds", exclude=True, repr=False)
     outlier_filter: Callable[[Sequence[float]], Sequence[float]] = pydantic.Field(
-        default=lambda x: list(x),
+        default=list,
         exclude=True,
         repr=False,
         description="Function to filter outliers from data"
     )
+    loops: int = pydantic.Field(1, description="Number of calls timed together in each measurement")
+    warmup_overhead: float = pydantic.Field(0.0, description="Warm-up time exceeding the steady-state median time (e.g. JIT compilation), 0 when warm-up was not slower")
 
     @cached_property
     def filtered_times(self) -> Sequence[float]:
         """Time measurements after removing outliers"""
         return self.outlier_filter(self.time_measurements)
     
+    @cached_property
+    def _stats(self) -> dict[str, float]:
+        """Summary statistics of the filtered times, computed once"""
+        times = np.asarray(self.filtered_times, dtype=np.float64)
+        if not times.size:
+            return dict.fromkeys(("total", "mean", "median", "min", "max", "std"), 0.0)
+        mean = times.mean()
+        return {
+            "total": float(times.sum()),
+            "mean": float(mean),
+            "median": _median(times),
+            "min": float(times.min()),
+            "max": float(times.max()),
+            "std": float(times.std(mean=mean)),
+        }
+    
     @pydantic.computed_field
     @property
     def total_time(self) -> float:
         """Total time after removing outliers"""
-        return sum(self.filtered_times)
+        return self._stats["total"]
 
     @pydantic.computed_field
     @property
     def mean_time(self) -> float:
         """Mean time after removing outliers"""
-        return sum(self.filtered_times) / len(self.filtered_times) if self.filtered_times else 0.0
+        return self._stats["mean"]
 
     @pydantic.computed_field
     @property
     def median_time(self) -> float:
         """Median time after removing outliers"""
-        if not self.filtered_times:
-            return 0.0
-        return sorted(self.filtered_times)[len(self.filtered_times) // 2]
+        return self._stats["median"]
     
     @pydantic.computed_field
     @property
     def min_time(self) -> float:
         """Minimum time after removing outliers"""
-        return min(self.filtered_times) if self.filtered_times else 0.0
+        return self._stats["min"]
     
     @pydantic.computed_field
     @property
     def max_time(self) -> float:
         """Maximum time after removing outliers"""
-        return max(self.filtered_times) if self.filtered_times else 0.0
+        return self._stats["max"]
     
     @pydantic.computed_field
     @property
     def std_dev(self) -> float:
         """Standard deviation of time after removing outliers"""
-        if not self.filtered_times:
-            return 0.0
-        variance = sum((x - self.mean_time) ** 2 for x in self.filtered_times) / len(self.filtered_times)
-        return variance ** 0.5
+        return self._stats["std"]
     
     @pydantic.computed_field
     @property